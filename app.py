@@ -3,11 +3,10 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from io import BytesIO
 
 from data_handler import load_data, save_data
 from matching_engine import find_matching_process
-from visualization import create_vacancy_chart, create_process_distribution
+from visualization import build_overview
 import database as db
 
 # Set page config
@@ -17,11 +16,58 @@ st.set_page_config(
     layout="wide"
 )
 
+# Cached database reads and derived values, keyed on db.data_version(). Every
+# write bumps it, so all sessions share the entries and see each other's
+# changes on their next rerun. The TTL drops entries for old versions.
+CACHE_TTL = 60
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _cached_processes(version):
+    return db.load_processes_from_db()
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _filter_options(version):
+    df = _cached_processes(version)
+    return sorted(df['Potential'].unique().tolist()), sorted(df['Communication'].unique().tolist())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _filtered_processes(version, potentials, communications):
+    return db.load_processes_filtered(potentials, communications)
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _process_names(version):
+    df = _cached_processes(version)
+    if df is None:
+        return ('None',)
+    return ('None',) + tuple(df['Process_Name'].tolist())
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _suggestions(version, potential, communication):
+    return db.get_process_suggestions(potential, communication)
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _history(version):
+    df = db.get_employee_assignments()
+    if 'assigned_at' in df.columns:
+        # SQLite stores CURRENT_TIMESTAMP as 'YYYY-MM-DD HH:MM:SS' text, so
+        # trimming the seconds gives the display format without parsing
+        df['assigned_at'] = df['assigned_at'].str.slice(0, 16)
+    return df
+
+# Figures are cached as plain dicts, which are cheaper to store than Figure objects
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _overview_fig(version):
+    return build_overview(_cached_processes(version)).to_dict()
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _excel_bytes(version):
+    return save_data(_cached_processes(version)).getvalue()
+
+# Load from the database on every rerun - a cache hit unless some session changed the data
+st.session_state.process_data = _cached_processes(db.data_version())
+
 # Initialize session state variables
-if 'process_data' not in st.session_state:
-    # Try to load from database first
-    st.session_state.process_data = db.load_processes_from_db()
-    
+
 if 'show_add_employee' not in st.session_state:
     st.session_state.show_add_employee = False
     
@@ -37,14 +83,10 @@ if 'employee_to_edit' not in st.session_state:
 if 'show_reset_db' not in st.session_state:
     st.session_state.show_reset_db = False
     
-if 'refresh_counter' not in st.session_state:
-    st.session_state.refresh_counter = 0
-    
 # Function to force refresh data from database
 def refresh_data():
-    st.session_state.process_data = db.load_processes_from_db()
-    # Increment refresh counter to trigger reactive reloads
-    st.session_state.refresh_counter += 1
+    # The write already bumped the data version, so this reads the new data
+    st.session_state.process_data = _cached_processes(db.data_version())
 
 # Title and description
 st.title("Employee-Process Matcher")
@@ -62,12 +104,14 @@ with st.sidebar:
     with upload_tab:
         uploaded_file = st.file_uploader("Upload Process Data (Excel/CSV)", type=['xlsx', 'csv'])
         
-        if uploaded_file is not None:
+        # The uploader keeps returning the same file on every rerun, so only import it once
+        if uploaded_file is not None and st.session_state.get('uploaded_file_id') != uploaded_file.file_id:
             try:
                 st.session_state.process_data = load_data(uploaded_file)
                 
                 # Save to database
                 db.save_processes_to_db(st.session_state.process_data)
+                st.session_state.uploaded_file_id = uploaded_file.file_id
                 
                 st.success(f"Successfully loaded {len(st.session_state.process_data)} processes!")
             except Exception as e:
@@ -75,12 +119,9 @@ with st.sidebar:
     
     with download_tab:
         if st.session_state.process_data is not None:
-            buffer = BytesIO()
-            st.session_state.process_data.to_excel(buffer, index=False)
-            buffer.seek(0)
             st.download_button(
                 label="Download Process Data",
-                data=buffer,
+                data=_excel_bytes(db.data_version()),
                 file_name="process_data.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
@@ -128,62 +169,56 @@ if st.session_state.process_data is None:
             st.error(f"Error loading sample data: {str(e)}")
     
 else:
-    # CRITICAL: Always reload fresh data to ensure we have the latest vacancy counts
-    # We're forcing a complete reload from the database every time
-    st.session_state.process_data = db.load_processes_from_db()
-    st.session_state.refresh_counter += 1
-    
-    # Display process data with real-time vacancy counts
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        st.subheader("Process Data")
-        
-        # Add a refresh button to force UI updates
-        if st.button("↻ Refresh Data", key=f"refresh_button_{st.session_state.refresh_counter}"):
-            # Complete forced reload from database
-            st.session_state.process_data = db.load_processes_from_db()
-            st.session_state.refresh_counter += 1
-            st.success("Data refreshed from database!")
-        
-        # Filter controls
-        filter_col1, filter_col2 = st.columns(2)
-        with filter_col1:
-            potential_filter = st.multiselect(
-                "Filter by Potential",
-                options=['All'] + sorted(st.session_state.process_data['Potential'].unique().tolist()),
-                default='All'
-            )
+    # The process panel is only drawn while no form is open, so typing in
+    # a form doesn't rebuild the grid and chart on every rerun
+    if not (st.session_state.show_add_employee or st.session_state.show_find_employee
+            or st.session_state.show_history or st.session_state.show_reset_db):
+        # Display process data with real-time vacancy counts
+        col1, col2 = st.columns([2, 1])
         
-        with filter_col2:
-            communication_filter = st.multiselect(
-                "Filter by Communication",
-                options=['All'] + sorted(st.session_state.process_data['Communication'].unique().tolist()),
-                default='All'
+        with col1:
+            st.subheader("Process Data")
+            
+            # Add a refresh button to force UI updates
+            if st.button("↻ Refresh Data", key="refresh_button"):
+                # Drop the cached reads in case the database was changed outside the app
+                st.cache_data.clear()
+                st.toast("Data refreshed from database!")
+                st.rerun()
+            
+            # Filter controls
+            potential_options, communication_options = _filter_options(db.data_version())
+            filter_col1, filter_col2 = st.columns(2)
+            with filter_col1:
+                potential_filter = st.multiselect(
+                    "Filter by Potential",
+                    options=['All'] + potential_options,
+                    default='All'
+                )
+            
+            with filter_col2:
+                communication_filter = st.multiselect(
+                    "Filter by Communication",
+                    options=['All'] + communication_options,
+                    default='All'
+                )
+            
+            # Apply filters in the database query
+            filtered_data = _filtered_processes(
+                db.data_version(),
+                tuple(potential_filter) if potential_filter and 'All' not in potential_filter else None,
+                tuple(communication_filter) if communication_filter and 'All' not in communication_filter else None
             )
-        
-        # Apply filters
-        filtered_data = st.session_state.process_data.copy()
-        
-        if potential_filter and 'All' not in potential_filter:
-            filtered_data = filtered_data[filtered_data['Potential'].isin(potential_filter)]
             
-        if communication_filter and 'All' not in communication_filter:
-            filtered_data = filtered_data[filtered_data['Communication'].isin(communication_filter)]
+            # Display filtered data - process_data is only reloaded when data_version changes
+            st.dataframe(filtered_data, use_container_width=True, key="process_data_grid")
         
-        # Display filtered data - add key based on refresh counter to force updates
-        st.dataframe(filtered_data, use_container_width=True, key=f"process_data_{st.session_state.refresh_counter}")
-    
-    with col2:
-        st.subheader("Vacancy Overview")
-        
-        # Create a vacancy chart - add key based on refresh counter to force updates
-        fig = create_vacancy_chart(st.session_state.process_data)
-        st.plotly_chart(fig, use_container_width=True, key=f"vacancy_chart_{st.session_state.refresh_counter}")
-        
-        # Create a potential distribution chart
-        fig2 = create_process_distribution(st.session_state.process_data)
-        st.plotly_chart(fig2, use_container_width=True, key=f"distribution_chart_{st.session_state.refresh_counter}")
+        with col2:
+            st.subheader("Vacancy Overview")
+            
+            # Vacancies and potential distribution in a single figure
+            fig = go.Figure(_overview_fig(db.data_version()))
+            st.plotly_chart(fig, use_container_width=True, key="overview_chart")
     
     # Add sidebar button for find employee
     if st.session_state.process_data is not None:
@@ -205,108 +240,90 @@ else:
         st.divider()
         st.subheader("Add New Employee")
         
-        # Use session state to store employee data temporarily
-        if 'temp_employee_name' not in st.session_state:
-            st.session_state.temp_employee_name = ""
-        if 'temp_employee_email' not in st.session_state:
-            st.session_state.temp_employee_email = ""
-        if 'temp_potential' not in st.session_state:
-            st.session_state.temp_potential = "Sales"
-        if 'temp_communication' not in st.session_state:
-            st.session_state.temp_communication = "Excellent"
         if 'show_process_list' not in st.session_state:
             st.session_state.show_process_list = False
             
-        # Input form for employee details
+        # Input form for employee details - the keyed widgets keep their values
+        # in session state and only rerun the script on submit
         with st.form("employee_form"):
             col1, col2 = st.columns(2)
             
             with col1:
-                st.session_state.temp_employee_name = st.text_input("Employee Name", value=st.session_state.temp_employee_name)
-                st.session_state.temp_employee_email = st.text_input("Employee Email (unique)", value=st.session_state.temp_employee_email)
-                st.session_state.temp_potential = st.selectbox(
+                st.text_input("Employee Name", key="employee_form_name")
+                st.text_input("Employee Email (unique)", key="employee_form_email")
+                st.selectbox(
                     "Potential",
                     options=['Sales', 'Consultation', 'Service', 'Support'],
-                    index=['Sales', 'Consultation', 'Service', 'Support'].index(st.session_state.temp_potential)
+                    key="employee_form_potential"
                 )
             
             with col2:
-                st.session_state.temp_communication = st.selectbox(
+                st.selectbox(
                     "Communication",
                     options=['Excellent', 'Very Good', 'Good'],
-                    index=['Excellent', 'Very Good', 'Good'].index(st.session_state.temp_communication)
+                    key="employee_form_communication"
                 )
             
             submitted = st.form_submit_button("Find Matching Processes")
             
             if submitted:
-                if not st.session_state.temp_employee_name or not st.session_state.temp_employee_email:
+                if not st.session_state.employee_form_name or not st.session_state.employee_form_email:
                     st.error("Please enter both employee name and email")
                 else:
                     st.session_state.show_process_list = True
         
         # Show process list outside of form (so buttons will work)
         if st.session_state.show_process_list:
-            employee_name = st.session_state.temp_employee_name
-            employee_email = st.session_state.temp_employee_email
-            potential = st.session_state.temp_potential
-            communication = st.session_state.temp_communication
+            employee_name = st.session_state.employee_form_name
+            employee_email = st.session_state.employee_form_email
+            potential = st.session_state.employee_form_potential
+            communication = st.session_state.employee_form_communication
             
             # Get suggested processes sorted by vacancy (high to low)
-            matching_processes = db.get_process_suggestions(potential, communication)
+            matching_processes = _suggestions(db.data_version(), potential, communication)
             
             if not matching_processes.empty:
                 st.success(f"Found {len(matching_processes)} matching processes for {employee_name}!")
                 
-                # Display all matching processes
+                # Display all matching processes - selecting a row picks the process to assign
                 st.subheader("Available Matching Processes (Sorted by Vacancy)")
-                st.dataframe(matching_processes, use_container_width=True)
-                
-                # Display processes with an 'Add' button for each process
-                st.subheader("Available Matching Processes (Select one to assign)")
+                st.caption("Select a process to assign")
+                event = st.dataframe(
+                    matching_processes,
+                    use_container_width=True,
+                    on_select="rerun",
+                    selection_mode="single-row",
+                    # A new search gets a new key, so an old row selection doesn't carry over
+                    key=f"match_selection_{potential}_{communication}"
+                )
                 
-                # Create a DataFrame with an additional "Action" column
-                # We'll use this custom dataframe view with buttons
-                processes_with_actions = matching_processes.copy()
+                selected_rows = event.selection.rows
+                process_name = None
+                # The list can still shrink under a kept selection after a data change
+                if selected_rows and selected_rows[0] < len(matching_processes):
+                    process_name = matching_processes.iloc[selected_rows[0]]['Process_Name']
                 
-                # Display the processes
-                for i, row in processes_with_actions.iterrows():
-                    process_name = row['Process_Name']
-                    vacancy = row['Vacancy']
-                    potential_val = row['Potential']
-                    comm_val = row['Communication']
-                    
-                    col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-                    
-                    with col1:
-                        st.write(f"**{process_name}** (Vacancy: {vacancy})")
-                    with col2:
-                        st.write(f"Potential: {potential_val}")
-                    with col3:
-                        st.write(f"Communication: {comm_val}")
-                    with col4:
-                        if st.button(f"Add to {process_name}", key=f"add_{i}"):
-                            # Add employee to the database with selected process
-                            success, message = db.add_employee(
-                                employee_name, 
-                                employee_email,
-                                potential, 
-                                communication, 
-                                process_name
-                            )
-                            
-                            if success:
-                                # Reload the process data from database to ensure it's up to date
-                                # (vacancy is already updated in the add_employee function)
-                                st.session_state.process_data = db.load_processes_from_db()
-                                
-                                st.success(f"Successfully assigned {employee_name} to {process_name}!")
-                                st.session_state.show_process_list = False
-                                st.rerun()
-                            else:
-                                st.error(message)
+                if st.button(f"Assign to {process_name}" if process_name else "Assign",
+                             key="assign_process", type="primary", disabled=process_name is None):
+                    # Add employee to the database with selected process
+                    success, message = db.add_employee(
+                        employee_name, 
+                        employee_email,
+                        potential, 
+                        communication, 
+                        process_name
+                    )
                     
-                    st.divider()
+                    if success:
+                        # Reload the process data from database to ensure it's up to date
+                        # (vacancy is already updated in the add_employee function)
+                        refresh_data()
+                        
+                        st.success(f"Successfully assigned {employee_name} to {process_name}!")
+                        st.session_state.show_process_list = False
+                        st.rerun()
+                    else:
+                        st.error(message)
             else:
                 st.error("No matching processes found with available vacancies")
                 
@@ -324,6 +341,7 @@ else:
                         )
                         
                         if success:
+                            refresh_data()
                             st.success("Employee added without process assignment")
                             st.session_state.show_process_list = False
                             st.rerun()
@@ -352,16 +370,17 @@ else:
                 if employee:
                     st.success(f"Found employee: {employee['name']}")
                     
-                    # Display employee info
-                    employee_info = pd.DataFrame([{
-                        'Name': employee['name'],
-                        'Email': employee['email'],
-                        'Potential': employee['potential'],
-                        'Communication': employee['communication'],
-                        'Process': employee['process_name'] or 'Not Assigned'
-                    }])
-                    
-                    st.dataframe(employee_info, use_container_width=True)
+                    # Display employee info as a static field/value table
+                    st.table({
+                        'Field': ['Name', 'Email', 'Potential', 'Communication', 'Process'],
+                        'Value': [
+                            employee['name'],
+                            employee['email'],
+                            employee['potential'],
+                            employee['communication'],
+                            employee['process_name'] or 'Not Assigned'
+                        ]
+                    })
                     
                     # Edit and Delete buttons
                     edit_col, delete_col = st.columns(2)
@@ -376,7 +395,7 @@ else:
                                 success, message = db.delete_employee(employee['id'])
                                 if success:
                                     # Reload process data to reflect updated vacancies
-                                    st.session_state.process_data = db.load_processes_from_db()
+                                    refresh_data()
                                     
                                     st.success(message)
                                     st.rerun()
@@ -414,10 +433,7 @@ else:
                     )
                     
                     # Get all processes
-                    processes = []
-                    if st.session_state.process_data is not None:
-                        processes = st.session_state.process_data['Process_Name'].tolist()
-                    processes.insert(0, 'None')
+                    processes = _process_names(db.data_version())
                     
                     # Determine the index for the current process
                     current_idx = 0
@@ -450,7 +466,7 @@ else:
                     
                     if success:
                         # Reload the process data to reflect any vacancy changes
-                        st.session_state.process_data = db.load_processes_from_db()
+                        refresh_data()
                         
                         st.success(message)
                         st.session_state.employee_to_edit = None
@@ -498,17 +514,12 @@ else:
         st.divider()
         st.subheader("Employee Assignment History")
         
-        # Get employee history from database
-        employee_data = db.get_employee_assignments()
+        # Get employee history from database, formatted once per data version
+        employee_data = _history(db.data_version())
         
         if employee_data.empty:
             st.info("No employee assignments found in the database.")
         else:
-            # Format date column
-            if 'assigned_at' in employee_data.columns:
-                employee_data['assigned_at'] = pd.to_datetime(
-                    employee_data['assigned_at']).dt.strftime('%Y-%m-%d %H:%M')
-            
             # Display the assignments
             st.dataframe(employee_data, use_container_width=True)
             
@@ -1,7 +1,71 @@
 import pandas as pd
 import numpy as np
+import os
 from io import BytesIO
 
+# Keep a copy of every uploaded file on disk for debugging
+SAVE_UPLOAD_COPIES = True
+UPLOAD_COPY_DIR = "processed_uploads"
+
+# Column types for the parsers to produce directly instead of object columns
+READ_DTYPES = {'Vacancy': 'Int64', 'Potential': 'category', 'Communication': 'category'}
+
+def _save_upload_copy(file_name, raw):
+    """Write the raw bytes of an upload to the debug copy directory"""
+    if not SAVE_UPLOAD_COPIES:
+        return
+    os.makedirs(UPLOAD_COPY_DIR, exist_ok=True)
+    with open(os.path.join(UPLOAD_COPY_DIR, file_name), "wb") as f:
+        f.write(raw)
+
+def _strip_values(column):
+    """
+    Strip surrounding whitespace from the values of a text column
+    
+    Categorical columns from the parser are stripped per category rather than
+    per row. Empty cells become the string 'nan' so validation reports them.
+    
+    Args:
+        column: Series to strip
+    
+    Returns:
+        Series: Stripped column
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype) and not (column.cat.codes == -1).any():
+        stripped = column.cat.categories.astype(str).str.strip()
+        # Categories that only differ by whitespace can't be renamed onto each other
+        if stripped.is_unique:
+            return column.cat.rename_categories(stripped)
+    return column.astype(str).str.strip().fillna('nan')
+
+def _as_categories(column, categories):
+    """Convert a validated column to a categorical with the given categories"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Recode the existing categories instead of hashing every row again
+        return column.cat.set_categories(categories)
+    return pd.Categorical(column, categories=categories)
+
+def _parse_upload(reader, raw, **kwargs):
+    """
+    Parse upload bytes with READ_DTYPES, falling back to an untyped read
+    
+    The typed read only fails when a Vacancy cell isn't an integer. The untyped
+    retry lets load_data report that with its own validation message instead
+    of the parser's error text.
+    
+    Args:
+        reader: pandas reader function (read_excel or read_csv)
+        raw: Uploaded file bytes
+        **kwargs: Extra arguments for the reader
+    
+    Returns:
+        DataFrame: Parsed data
+    """
+    try:
+        return reader(BytesIO(raw), dtype=READ_DTYPES, **kwargs)
+    except (ValueError, TypeError):
+        return reader(BytesIO(raw), **kwargs)
+
 def load_data(file):
     """
     Load process data from an uploaded file (Excel or CSV)
@@ -15,22 +79,17 @@ def load_data(file):
     # Check file extension
     if file.name.endswith('.xlsx'):
         try:
-            data = pd.read_excel(file)
-            # Save a copy of the file for debugging
-            with open(f"processed_uploads/{file.name}", "wb") as f:
-                file.seek(0)
-                f.write(file.getvalue())
-                file.seek(0)
+            # Take the upload buffer once and reuse it for parsing and the debug copy
+            raw = file.getvalue()
+            data = _parse_upload(pd.read_excel, raw, engine='calamine')
+            _save_upload_copy(file.name, raw)
         except Exception as e:
             raise ValueError(f"Error reading Excel file: {str(e)}")
     elif file.name.endswith('.csv'):
         try:
-            data = pd.read_csv(file)
-            # Save a copy of the file for debugging
-            with open(f"processed_uploads/{file.name}", "wb") as f:
-                file.seek(0)
-                f.write(file.getvalue())
-                file.seek(0)
+            raw = file.getvalue()
+            data = _parse_upload(pd.read_csv, raw, engine='pyarrow')
+            _save_upload_copy(file.name, raw)
         except Exception as e:
             raise ValueError(f"Error reading CSV file: {str(e)}")
     else:
@@ -44,32 +103,47 @@ def load_data(file):
         raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
     
     # Validate data types and values
-    if not pd.api.types.is_numeric_dtype(data['Vacancy']):
+    if pd.api.types.is_integer_dtype(data['Vacancy']):
+        # Fast path: the parser produced integers, only empty cells are left to reject
+        if data['Vacancy'].isna().any():
+            raise ValueError("Vacancy must contain numeric values")
+    else:
+        # The typed parse failed, so coerce the untyped column here
         try:
-            data['Vacancy'] = pd.to_numeric(data['Vacancy'])
-        except ValueError:
+            data['Vacancy'] = pd.to_numeric(data['Vacancy'], downcast='integer')
+        except (ValueError, TypeError):
+            raise ValueError("Vacancy must contain numeric values")
+        
+        # Whole numbers were downcast to integers, so a float column means
+        # fractional or missing vacancies
+        if not pd.api.types.is_integer_dtype(data['Vacancy']):
             raise ValueError("Vacancy must contain numeric values")
     
     # Validate potential values
     valid_potentials = ['Sales', 'Consultation', 'Service', 'Support']
-    # Convert to string and strip any whitespace
-    data['Potential'] = data['Potential'].astype(str).str.strip()
-    invalid_potentials = data[~data['Potential'].isin(valid_potentials)]['Potential'].unique()
+    # Strip any whitespace
+    data['Potential'] = _strip_values(data['Potential'])
+    # Compare distinct values only rather than selecting the offending rows
+    invalid_potentials = set(data['Potential'].unique()).difference(valid_potentials)
     
-    if len(invalid_potentials) > 0:
-        raise ValueError(f"Invalid potential values found: {', '.join(map(str, invalid_potentials))}. "
+    if invalid_potentials:
+        raise ValueError(f"Invalid potential values found: {', '.join(sorted(invalid_potentials))}. "
                          f"Valid values are: {', '.join(valid_potentials)}")
     
     # Validate communication values
     valid_communications = ['Excellent', 'Very Good', 'Good']
-    # Convert to string and strip any whitespace
-    data['Communication'] = data['Communication'].astype(str).str.strip()
-    invalid_communications = data[~data['Communication'].isin(valid_communications)]['Communication'].unique()
+    # Strip any whitespace
+    data['Communication'] = _strip_values(data['Communication'])
+    invalid_communications = set(data['Communication'].unique()).difference(valid_communications)
     
-    if len(invalid_communications) > 0:
-        raise ValueError(f"Invalid communication values found: {', '.join(map(str, invalid_communications))}. "
+    if invalid_communications:
+        raise ValueError(f"Invalid communication values found: {', '.join(sorted(invalid_communications))}. "
                          f"Valid values are: {', '.join(valid_communications)}")
     
+    # Store the validated columns as categoricals so equality filters compare integer codes
+    data['Potential'] = _as_categories(data['Potential'], valid_potentials)
+    data['Communication'] = _as_categories(data['Communication'], valid_communications)
+    
     return data
 
 def save_data(data):
@@ -83,6 +157,6 @@ def save_data(data):
         BytesIO: Excel file as BytesIO object
     """
     buffer = BytesIO()
-    data.to_excel(buffer, index=False)
+    data.to_excel(buffer, index=False, engine='xlsxwriter')
     buffer.seek(0)
     return buffer
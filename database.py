@@ -1,4 +1,5 @@
 import sqlite3
+import threading
 import pandas as pd
 import os
 from datetime import datetime
@@ -6,15 +7,220 @@ from datetime import datetime
 # Database file path
 DB_PATH = 'employee_process_matcher.db'
 
+# Connection settings applied to every connection we open
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Shared connection reused by every function in this module. Streamlit
+# imports modules once per server process, so this survives script reruns
+# the same way an st.cache_resource connection would. It runs in
+# autocommit mode, so multi-statement writes issue their own BEGIN/COMMIT,
+# and _LOCK keeps Streamlit's script threads from interleaving on it.
+_CONN = None
+_LOCK = threading.RLock()
+
+# Bumped after every committed change to the stored data. Like the connection
+# it is shared by all sessions, so caches keyed on data_version() see each
+# other's writes straight away.
+_DATA_VERSION = 0
+
+# Process name -> process ID. Processes only change when a new set is saved,
+# so save_processes_to_db refills this and init_db/reset_database clear it.
+_PROCESS_ID_CACHE = {}
+
+# Size of the per-connection prepared statement cache
+_CACHED_STATEMENTS = 256
+
+# Emails checked per query in bulk_add_employees
+_EMAIL_CHUNK = 500
+
+# Categories for loaded process data, in the order validated on upload
+_PROCESS_CATEGORIES = {
+    'Potential': ['Sales', 'Consultation', 'Service', 'Support'],
+    'Communication': ['Excellent', 'Very Good', 'Good']
+}
+
+# Vacancies are narrowed to int16 only when every value fits
+_INT16_MIN, _INT16_MAX = -32768, 32767
+
+# SQL shared by the functions below. Keeping each statement as a single
+# literal means every caller hits the same prepared statement cache entry.
+_SQL_INSERT_PROCESS = (
+    "INSERT INTO processes (process_name, potential, communication, vacancy) VALUES (?, ?, ?, ?)"
+)
+
+_SQL_LOAD_PROCESSES = (
+    "SELECT process_name as Process_Name, potential as Potential, "
+    "communication as Communication, vacancy as Vacancy FROM processes"
+)
+
+_SQL_TAKE_VACANCY = """
+    UPDATE processes 
+    SET vacancy = vacancy - 1
+    WHERE process_name = ? AND vacancy > 0
+    RETURNING id, vacancy
+"""
+
+_SQL_RELEASE_VACANCY = "UPDATE processes SET vacancy = vacancy + 1 WHERE process_name = ?"
+
+_SQL_PROCESS_ID = "SELECT id FROM processes WHERE process_name = ?"
+
+_SQL_PROCESS_IDS = "SELECT process_name, MIN(id) FROM processes GROUP BY process_name"
+
+_SQL_PROCESS_SUGGESTIONS = """
+    SELECT process_name as Process_Name, potential as Potential, 
+           communication as Communication, vacancy as Vacancy
+    FROM processes
+    WHERE potential = ? AND communication = ? AND vacancy > 0
+    ORDER BY vacancy DESC
+"""
+
+_SQL_BEST_MATCH = """
+    SELECT process_name, potential, communication, vacancy
+    FROM processes
+    WHERE potential = ? AND communication = ? AND vacancy > 0
+    ORDER BY vacancy DESC
+    LIMIT 1
+"""
+
+_SQL_BEST_POTENTIAL_MATCH = """
+    SELECT process_name, potential, communication, vacancy
+    FROM processes
+    WHERE potential = ? AND vacancy > 0
+    ORDER BY vacancy DESC
+    LIMIT 1
+"""
+
+_SQL_INSERT_EMPLOYEE = (
+    "INSERT INTO employees (name, email, potential, communication, process_id, process_name) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+_SQL_SET_VACANCY = "UPDATE processes SET vacancy = ? WHERE id = ?"
+
+_SQL_EMAIL_EXISTS = "SELECT COUNT(*) FROM employees WHERE LOWER(email) = ?"
+
+_SQL_EMAIL_TAKEN = "SELECT id FROM employees WHERE LOWER(email) = ? AND id != ?"
+
+_SQL_FIND_EMPLOYEE = """
+    SELECT e.id, e.name, e.email, e.potential, e.communication, 
+           e.process_id, e.process_name
+    FROM employees e
+    WHERE LOWER(e.email) = ?
+"""
+
+_SQL_UPDATE_EMPLOYEE = """
+    UPDATE employees 
+    SET name = ?, email = ?, potential = ?, communication = ?, 
+        process_id = ?, process_name = ?
+    WHERE id = ?
+"""
+
+_SQL_EMPLOYEE_ASSIGNMENTS = """
+    SELECT e.id, e.name, e.email, e.potential, e.communication, 
+           e.process_name, e.assigned_at
+    FROM employees e
+    ORDER BY e.assigned_at DESC
+"""
+
+_SQL_ASSIGNMENT_HISTORY = """
+    SELECT 
+        date(assigned_at) as assignment_date,
+        COUNT(*) as assignments,
+        SUM(CASE WHEN process_id IS NOT NULL THEN 1 ELSE 0 END) as successful_matches,
+        SUM(CASE WHEN process_id IS NULL THEN 1 ELSE 0 END) as no_matches
+    FROM employees
+    GROUP BY date(assigned_at)
+    ORDER BY date(assigned_at) DESC
+"""
+
+def _connect():
+    """Open a connection to the database with the performance PRAGMAs applied"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None,
+                           cached_statements=_CACHED_STATEMENTS)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def _close_connection():
+    """Close the shared connection if it is open"""
+    global _CONN
+    if _CONN is not None:
+        _CONN.close()
+        _CONN = None
+
+def data_version():
+    """Return a counter that changes whenever the stored data changes"""
+    return _DATA_VERSION
+
+def _bump_data_version():
+    """Mark the stored data as changed. Callers must hold _LOCK."""
+    global _DATA_VERSION
+    _DATA_VERSION += 1
+
+def _read_frame(sql, params=()):
+    """
+    Run a query on the shared connection and build a DataFrame from the rows
+    
+    Callers must hold _LOCK.
+    
+    Args:
+        sql: Query to run
+        params: Query parameters
+    
+    Returns:
+        DataFrame: Query results with the selected column names
+    """
+    cursor = _CONN.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+def _read_processes(sql, params=()):
+    """
+    Read process rows into a DataFrame with the narrow process column types
+    
+    Callers must hold _LOCK.
+    
+    Args:
+        sql: Query selecting the process columns
+        params: Query parameters
+    
+    Returns:
+        DataFrame: Processes with categorical potential/communication and,
+            when the values fit, int16 vacancy
+    """
+    df = _read_frame(sql, params)
+    
+    for column, categories in _PROCESS_CATEGORIES.items():
+        # Rows that skipped upload validation (e.g. sample data) can hold other
+        # values - keep them as extra categories instead of turning them into NaN
+        extra = sorted(set(df[column].dropna()) - set(categories))
+        df[column] = pd.Categorical(df[column], categories=categories + extra)
+    
+    vacancy = df['Vacancy']
+    if df.empty or (vacancy.min() >= _INT16_MIN and vacancy.max() <= _INT16_MAX):
+        df['Vacancy'] = vacancy.astype('int16')
+    
+    return df
+
 def init_db():
     """Initialize the database with required tables if they don't exist."""
-    # Remove existing database to ensure we have the correct schema
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
+    global _CONN
+    with _LOCK:
+        _PROCESS_ID_CACHE.clear()
         
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+        # Existing data is kept - reset_database is the destructive path
+        if _CONN is None:
+            _CONN = _connect()
+        _create_schema(_CONN.cursor())
+
+def _create_schema(cursor):
+    """Create the tables and indexes used by the application"""
     # Create process table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS processes (
@@ -42,8 +248,25 @@ def init_db():
     )
     ''')
     
-    conn.commit()
-    conn.close()
+    # Index the case-folded email so email lookups don't scan the table
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_employees_email_lower ON employees (LOWER(email))"
+    )
+    
+    # Index the matching columns so best-match lookups can walk the index in vacancy order
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_processes_match ON processes (potential, communication, vacancy)"
+    )
+    
+    # Index process names for the per-name vacancy updates and lookups
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_processes_name ON processes (process_name)"
+    )
+    
+    # Index assignment times so history queries read in order instead of sorting
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_employees_assigned_at ON employees (assigned_at DESC)"
+    )
 
 def save_processes_to_db(process_data):
     """
@@ -52,20 +275,30 @@ def save_processes_to_db(process_data):
     Args:
         process_data: DataFrame containing process information
     """
-    conn = sqlite3.connect(DB_PATH)
-    
-    # Clear existing processes
-    conn.execute("DELETE FROM processes")
-    
-    # Insert new processes
-    for _, row in process_data.iterrows():
-        conn.execute(
-            "INSERT INTO processes (process_name, potential, communication, vacancy) VALUES (?, ?, ?, ?)",
-            (row['Process_Name'], row['Potential'], row['Communication'], row['Vacancy'])
-        )
-    
-    conn.commit()
-    conn.close()
+    # Build the rows column-wise so the whole batch goes in with one statement
+    rows = list(zip(
+        process_data['Process_Name'].tolist(),
+        process_data['Potential'].tolist(),
+        process_data['Communication'].tolist(),
+        process_data['Vacancy'].astype(int).tolist()
+    ))
+    
+    with _LOCK:
+        # Clear and reload processes in a single transaction
+        _CONN.execute("BEGIN TRANSACTION")
+        try:
+            _CONN.execute("DELETE FROM processes")
+            _CONN.executemany(_SQL_INSERT_PROCESS, rows)
+            process_ids = dict(_CONN.execute(_SQL_PROCESS_IDS).fetchall())
+        except Exception:
+            _CONN.execute("ROLLBACK")
+            raise
+        _CONN.execute("COMMIT")
+        _bump_data_version()
+        
+        # Remember the new IDs so lookups by name skip the database
+        _PROCESS_ID_CACHE.clear()
+        _PROCESS_ID_CACHE.update(process_ids)
 
 def load_processes_from_db():
     """
@@ -74,27 +307,43 @@ def load_processes_from_db():
     Returns:
         DataFrame: Processes data or None if database is empty
     """
-    conn = sqlite3.connect(DB_PATH)
-    
-    # Check if we have any processes
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM processes")
-    count = cursor.fetchone()[0]
+    with _LOCK:
+        # Load processes into DataFrame
+        df = _read_processes(_SQL_LOAD_PROCESSES)
     
-    if count == 0:
-        conn.close()
-        return None
+    # An empty table means no processes have been loaded yet
+    return None if df.empty else df
+
+def load_processes_filtered(potentials=None, communications=None):
+    """
+    Load processes matching the given potentials and communication levels
     
-    # Load processes into DataFrame
-    df = pd.read_sql("SELECT process_name as Process_Name, potential as Potential, "
-                     "communication as Communication, vacancy as Vacancy FROM processes", conn)
+    Args:
+        potentials: Potentials to include, or None/empty for all
+        communications: Communication levels to include, or None/empty for all
     
-    conn.close()
-    return df
+    Returns:
+        DataFrame: Matching processes (empty if none match)
+    """
+    conditions = []
+    params = []
+    for column, values in (('potential', potentials), ('communication', communications)):
+        if values:
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    
+    query = _SQL_LOAD_PROCESSES
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    # Keep the upload order even when the planner walks an index
+    query += " ORDER BY id"
+    
+    with _LOCK:
+        return _read_processes(query, params)
 
 def update_process_vacancy(process_name, change):
     """
-    Update vacancy count for a process - COMPLETELY REBUILT
+    Update vacancy count for a process
     
     Args:
         process_name: Name of the process to update
@@ -103,47 +352,75 @@ def update_process_vacancy(process_name, change):
     Returns:
         bool: True if successful, False otherwise
     """
-    # Open a new connection to ensure we're getting the latest data
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Use direct SQL for atomic update to avoid race conditions
-    if change < 0:
-        # For decreasing vacancy, make sure it doesn't go below 0
-        cursor.execute("""
-            UPDATE processes 
-            SET vacancy = CASE
-                WHEN vacancy + ? < 0 THEN 0
-                ELSE vacancy + ?
-            END
-            WHERE process_name = ?
-        """, (change, change, process_name))
-    else:
-        # For increasing vacancy, just add
-        cursor.execute("""
-            UPDATE processes 
-            SET vacancy = vacancy + ?
-            WHERE process_name = ?
-        """, (change, process_name))
-    
-    # Check if any rows were affected
-    if cursor.rowcount == 0:
-        conn.close()
-        return False
-    
-    # Commit and close
-    conn.commit()
-    conn.close()
-    
-    # Verify the update happened correctly
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT vacancy FROM processes WHERE process_name = ?", (process_name,))
+    with _LOCK:
+        cursor = _CONN.cursor()
+        
+        # Use direct SQL for atomic update to avoid race conditions
+        if change < 0:
+            # For decreasing vacancy, make sure it doesn't go below 0
+            cursor.execute("""
+                UPDATE processes 
+                SET vacancy = CASE
+                    WHEN vacancy + ? < 0 THEN 0
+                    ELSE vacancy + ?
+                END
+                WHERE process_name = ?
+            """, (change, change, process_name))
+        else:
+            # For increasing vacancy, just add
+            cursor.execute("""
+                UPDATE processes 
+                SET vacancy = vacancy + ?
+                WHERE process_name = ?
+            """, (change, process_name))
+        
+        # The process exists if the update touched any rows
+        if cursor.rowcount == 0:
+            return False
+        _bump_data_version()
+        return True
+
+def _lookup_process_id(cursor, process_name):
+    """
+    Get a process ID by name, going to the database only on a cache miss
+    
+    Args:
+        cursor: Cursor on the shared connection
+        process_name: Name of the process
+    
+    Returns:
+        int: ID of the process, or None if it doesn't exist
+    """
+    process_id = _PROCESS_ID_CACHE.get(process_name)
+    if process_id is None:
+        cursor.execute(_SQL_PROCESS_ID, (process_name,))
+        result = cursor.fetchone()
+        if result:
+            process_id = _PROCESS_ID_CACHE[process_name] = result[0]
+    return process_id
+
+def _take_vacancy(cursor, process_name):
+    """
+    Decrease a process vacancy by one inside the caller's transaction
+    
+    Args:
+        cursor: Cursor with an open transaction
+        process_name: Name of the process to take a vacancy from
+    
+    Returns:
+        int: ID of the process, or None if it could not be taken
+        str: Error message if any
+    """
+    cursor.execute(_SQL_TAKE_VACANCY, (process_name,))
     result = cursor.fetchone()
-    conn.close()
     
-    # Return true if we found the process
-    return result is not None
+    if result:
+        return result[0], None
+    
+    # Nothing was updated - work out whether the process is missing or full
+    if _lookup_process_id(cursor, process_name) is not None:
+        return None, f"No vacancy available in {process_name}"
+    return None, f"Process {process_name} not found"
 
 def add_employee(name, email, potential, communication, process_name=None):
     """
@@ -160,91 +437,160 @@ def add_employee(name, email, potential, communication, process_name=None):
         bool: True if successful, False otherwise
         str: Error message if any
     """
-    # Clean up the database first to ensure deleted emails are purged
-    purge_deleted_emails()
-    
-    # Create a fresh connection for this transaction
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    try:
-        # Start a transaction
-        cursor.execute("BEGIN TRANSACTION")
-        
-        # Normalize the email to ensure case insensitivity
-        email = email.strip().lower()
-        
-        # Check if email already exists with more thorough check
-        cursor.execute("SELECT COUNT(*) FROM employees WHERE LOWER(email) = LOWER(?)", (email,))
-        count = cursor.fetchone()[0]
-        
-        if count > 0:
-            # Roll back - no changes made
-            cursor.execute("ROLLBACK")
-            conn.close()
-            return False, "Email already exists in the database"
+    with _LOCK:
+        cursor = _CONN.cursor()
         
-        process_id = None
-        if process_name:
-            # Get process ID and check vacancy atomically
-            cursor.execute("SELECT id, vacancy FROM processes WHERE process_name = ?", (process_name,))
-            result = cursor.fetchone()
+        try:
+            # Start a transaction
+            cursor.execute("BEGIN TRANSACTION")
             
-            if not result:
+            # Normalize the email to ensure case insensitivity
+            email = email.strip().lower()
+            
+            # Check if email already exists with more thorough check
+            cursor.execute(_SQL_EMAIL_EXISTS, (email,))
+            count = cursor.fetchone()[0]
+            
+            if count > 0:
+                # Roll back - no changes made
                 cursor.execute("ROLLBACK")
-                conn.close()
-                return False, f"Process {process_name} not found"
+                return False, "Email already exists in the database"
+            
+            process_id = None
+            if process_name:
+                # Take one vacancy and get the process ID in a single statement
+                process_id, error = _take_vacancy(cursor, process_name)
                 
-            process_id = result[0]
-            current_vacancy = result[1]
+                if process_id is None:
+                    cursor.execute("ROLLBACK")
+                    return False, error
             
-            # Check if there's still vacancy available
-            if current_vacancy <= 0:
-                cursor.execute("ROLLBACK")
-                conn.close()
-                return False, f"No vacancy available in {process_name}"
+            # Add employee
+            cursor.execute(
+                _SQL_INSERT_EMPLOYEE,
+                (name, email, potential, communication, process_id, process_name)
+            )
             
-            # Update vacancy count atomically using direct SQL
-            # This ensures the vacancy is updated reliably
-            cursor.execute("""
-                UPDATE processes 
-                SET vacancy = CASE
-                    WHEN vacancy > 0 THEN vacancy - 1
-                    ELSE 0
-                END
-                WHERE process_name = ?
-            """, (process_name,))
+            # Everything worked, commit the transaction
+            cursor.execute("COMMIT")
+            _bump_data_version()
             
-            # Verify the update worked
-            if cursor.rowcount == 0:
-                cursor.execute("ROLLBACK")
-                conn.close()
-                return False, f"Failed to update vacancy for {process_name}"
-        
-        # Add employee
-        cursor.execute(
-            "INSERT INTO employees (name, email, potential, communication, process_id, process_name) VALUES (?, ?, ?, ?, ?, ?)",
-            (name, email, potential, communication, process_id, process_name)
-        )
-        
-        # Everything worked, commit the transaction
-        cursor.execute("COMMIT")
-        conn.close()
+            return True, "Employee added successfully"
         
-        # Force vacuum to ensure database is clean
-        purge_deleted_emails()
-        
-        return True, "Employee added successfully"
+        except Exception as e:
+            # Something went wrong, roll back any changes
+            try:
+                cursor.execute("ROLLBACK")
+            except:
+                pass
+            
+            return False, f"Database error: {str(e)}"
+
+def bulk_add_employees(records):
+    """
+    Add a batch of employees in a single transaction
     
-    except Exception as e:
-        # Something went wrong, roll back any changes
+    The whole batch is rejected if any email is already taken or any
+    assigned process is missing or runs out of vacancies.
+    
+    Args:
+        records: Iterable of (name, email, potential, communication, process_name)
+            tuples, with process_name None for unassigned employees
+    
+    Returns:
+        bool: True if successful, False otherwise
+        str: Error message if any
+    """
+    # Normalize the emails the same way add_employee does
+    records = [
+        (name, email.strip().lower(), potential, communication, process_name)
+        for name, email, potential, communication, process_name in records
+    ]
+    if not records:
+        return True, "No employees to add"
+    
+    emails = [record[1] for record in records]
+    if len(set(emails)) != len(emails):
+        return False, "Duplicate emails in the import"
+    
+    with _LOCK:
+        cursor = _CONN.cursor()
+        
         try:
-            cursor.execute("ROLLBACK")
-        except:
-            pass
+            # Take the write lock up front so vacancies can't change under us
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            # Look up emails that are already taken, in chunks to stay under
+            # SQLite's host parameter limit
+            taken = []
+            for start in range(0, len(emails), _EMAIL_CHUNK):
+                chunk = emails[start:start + _EMAIL_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT LOWER(email) FROM employees WHERE LOWER(email) IN ({placeholders})",
+                    chunk
+                )
+                taken.extend(row[0] for row in cursor.fetchall())
+            if taken:
+                cursor.execute("ROLLBACK")
+                return False, f"Email already exists in the database: {', '.join(sorted(taken))}"
+            
+            # Fetch ID and current vacancy for every process in the batch at once.
+            # Uploads may repeat a process name, so each name maps to all its rows.
+            process_names = sorted({record[4] for record in records if record[4]})
+            processes = {}
+            if process_names:
+                placeholders = ", ".join("?" * len(process_names))
+                cursor.execute(
+                    f"SELECT process_name, id, vacancy FROM processes "
+                    f"WHERE process_name IN ({placeholders}) ORDER BY id",
+                    process_names
+                )
+                for name, process_id, vacancy in cursor.fetchall():
+                    processes.setdefault(name, []).append([process_id, vacancy])
+            
+            # Assign vacancies in memory
+            rows = []
+            for name, email, potential, communication, process_name in records:
+                process_id = None
+                if process_name:
+                    process_rows = processes.get(process_name)
+                    if process_rows is None:
+                        cursor.execute("ROLLBACK")
+                        return False, f"Process {process_name} not found"
+                    
+                    # Same rule as _take_vacancy: every row with this name that
+                    # still has a vacancy gives one up, and the first is assigned
+                    open_rows = [row for row in process_rows if row[1] > 0]
+                    if not open_rows:
+                        cursor.execute("ROLLBACK")
+                        return False, f"No vacancy available in {process_name}"
+                    for row in open_rows:
+                        row[1] -= 1
+                    process_id = open_rows[0][0]
+                rows.append((name, email, potential, communication, process_id, process_name))
+            
+            cursor.executemany(_SQL_INSERT_EMPLOYEE, rows)
+            
+            cursor.executemany(
+                _SQL_SET_VACANCY,
+                [(vacancy, process_id) for process_rows in processes.values()
+                 for process_id, vacancy in process_rows]
+            )
+            
+            cursor.execute("COMMIT")
+            _bump_data_version()
+            
+            return True, f"{len(rows)} employees added successfully"
         
-        conn.close()
-        return False, f"Database error: {str(e)}"
+        except Exception as e:
+            # Something went wrong, roll back any changes
+            try:
+                cursor.execute("ROLLBACK")
+            except:
+                pass
+            
+            return False, f"Database error: {str(e)}"
 
 def get_employee_assignments():
     """
@@ -253,19 +599,10 @@ def get_employee_assignments():
     Returns:
         DataFrame: Employee assignments data
     """
-    conn = sqlite3.connect(DB_PATH)
-    
-    query = """
-    SELECT e.id, e.name, e.email, e.potential, e.communication, 
-           e.process_name, e.assigned_at
-    FROM employees e
-    ORDER BY e.assigned_at DESC
-    """
-    
-    df = pd.read_sql(query, conn)
-    conn.close()
-    
-    return df
+    with _LOCK:
+        df = _read_frame(_SQL_EMPLOYEE_ASSIGNMENTS)
+        
+        return df
 
 def get_assignment_history():
     """
@@ -274,23 +611,10 @@ def get_assignment_history():
     Returns:
         DataFrame: Assignment history with counts by date
     """
-    conn = sqlite3.connect(DB_PATH)
-    
-    query = """
-    SELECT 
-        date(assigned_at) as assignment_date,
-        COUNT(*) as assignments,
-        SUM(CASE WHEN process_id IS NOT NULL THEN 1 ELSE 0 END) as successful_matches,
-        SUM(CASE WHEN process_id IS NULL THEN 1 ELSE 0 END) as no_matches
-    FROM employees
-    GROUP BY date(assigned_at)
-    ORDER BY date(assigned_at) DESC
-    """
-    
-    df = pd.read_sql(query, conn)
-    conn.close()
-    
-    return df
+    with _LOCK:
+        df = _read_frame(_SQL_ASSIGNMENT_HISTORY)
+        
+        return df
 
 def find_employee_by_email(email):
     """
@@ -302,33 +626,27 @@ def find_employee_by_email(email):
     Returns:
         dict: Employee data if found, None otherwise
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Normalize email for case-insensitive search
-    email = email.strip().lower()
-    
-    cursor.execute("""
-        SELECT e.id, e.name, e.email, e.potential, e.communication, 
-               e.process_id, e.process_name
-        FROM employees e
-        WHERE LOWER(e.email) = LOWER(?)
-    """, (email,))
-    
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result:
-        return {
-            'id': result[0],
-            'name': result[1],
-            'email': result[2],
-            'potential': result[3],
-            'communication': result[4],
-            'process_id': result[5],
-            'process_name': result[6]
-        }
-    return None
+    with _LOCK:
+        cursor = _CONN.cursor()
+        
+        # Normalize email for case-insensitive search
+        email = email.strip().lower()
+        
+        cursor.execute(_SQL_FIND_EMPLOYEE, (email,))
+        
+        result = cursor.fetchone()
+        
+        if result:
+            return {
+                'id': result[0],
+                'name': result[1],
+                'email': result[2],
+                'potential': result[3],
+                'communication': result[4],
+                'process_id': result[5],
+                'process_name': result[6]
+            }
+        return None
 
 def update_employee(employee_id, name, email, potential, communication, process_name=None):
     """
@@ -346,125 +664,80 @@ def update_employee(employee_id, name, email, potential, communication, process_
         bool: True if successful, False otherwise
         str: Error message if any
     """
-    # Clean up the database first
-    purge_deleted_emails()
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    try:
-        # Start transaction
-        cursor.execute("BEGIN TRANSACTION")
-        
-        # Normalize email for case-insensitive comparison
-        email = email.strip().lower()
+    with _LOCK:
+        cursor = _CONN.cursor()
         
-        # Check if email already exists for another employee (case insensitive)
-        cursor.execute("SELECT id FROM employees WHERE LOWER(email) = LOWER(?) AND id != ?", (email, employee_id))
-        if cursor.fetchone():
-            cursor.execute("ROLLBACK")
-            conn.close()
-            return False, "Email already exists for another employee"
-        
-        # Get current process assignment to update vacancy if changed
-        cursor.execute("SELECT process_name FROM employees WHERE id = ?", (employee_id,))
-        result = cursor.fetchone()
-        if not result:
-            cursor.execute("ROLLBACK")
-            conn.close()
-            return False, "Employee not found"
+        try:
+            # Start transaction
+            cursor.execute("BEGIN TRANSACTION")
             
-        old_process = result[0]
-        
-        # Update process vacancy counts if assignment changed
-        if old_process != process_name:
-            # Increase vacancy for old process if there was one
-            if old_process:
-                cursor.execute("""
-                    UPDATE processes 
-                    SET vacancy = vacancy + 1 
-                    WHERE process_name = ?
-                """, (old_process,))
-                
-                if cursor.rowcount == 0:
-                    # Old process not found, but continue anyway
-                    pass
+            # Normalize email for case-insensitive comparison
+            email = email.strip().lower()
             
-            # Get process ID and check vacancy for the new process
-            process_id = None
-            if process_name:
-                cursor.execute("SELECT id, vacancy FROM processes WHERE process_name = ?", (process_name,))
-                result = cursor.fetchone()
-                if not result:
-                    cursor.execute("ROLLBACK")
-                    conn.close()
-                    return False, f"Process {process_name} not found"
+            # Check if email already exists for another employee (case insensitive)
+            cursor.execute(_SQL_EMAIL_TAKEN, (email, employee_id))
+            if cursor.fetchone():
+                cursor.execute("ROLLBACK")
+                return False, "Email already exists for another employee"
+            
+            # Get current process assignment to update vacancy if changed
+            cursor.execute("SELECT process_name FROM employees WHERE id = ?", (employee_id,))
+            result = cursor.fetchone()
+            if not result:
+                cursor.execute("ROLLBACK")
+                return False, "Employee not found"
+            
+            old_process = result[0]
+            
+            # Update process vacancy counts if assignment changed
+            if old_process != process_name:
+                # Increase vacancy for old process if there was one
+                if old_process:
+                    cursor.execute(_SQL_RELEASE_VACANCY, (old_process,))
                     
-                process_id = result[0]
-                current_vacancy = result[1]
-                
-                # Check if there's vacancy available
-                if current_vacancy <= 0:
-                    cursor.execute("ROLLBACK")
-                    conn.close()
-                    return False, f"No vacancy available in {process_name}"
-                
-                # Decrease vacancy for new process - use the safer atomic SQL approach
-                cursor.execute("""
-                    UPDATE processes 
-                    SET vacancy = CASE
-                        WHEN vacancy > 0 THEN vacancy - 1
-                        ELSE 0
-                    END
-                    WHERE process_name = ?
-                """, (process_name,))
+                    if cursor.rowcount == 0:
+                        # Old process not found, but continue anyway
+                        pass
                 
-                if cursor.rowcount == 0:
-                    cursor.execute("ROLLBACK")
-                    conn.close()
-                    return False, f"Failed to update vacancy for {process_name}"
-        else:
-            # No change in process assignment
-            # Get process ID for the current process
-            process_id = None
-            if process_name:
-                cursor.execute("SELECT id FROM processes WHERE process_name = ?", (process_name,))
-                result = cursor.fetchone()
-                if result:
-                    process_id = result[0]
-        
-        # Update employee with the new details
-        cursor.execute("""
-            UPDATE employees 
-            SET name = ?, email = ?, potential = ?, communication = ?, 
-                process_id = ?, process_name = ?
-            WHERE id = ?
-        """, (name, email, potential, communication, process_id, process_name, employee_id))
-        
-        # Verify the update worked
-        if cursor.rowcount == 0:
-            cursor.execute("ROLLBACK")
-            conn.close()
-            return False, "Employee not found or no changes made"
-        
-        # All operations successful, commit
-        cursor.execute("COMMIT")
-        conn.close()
-        
-        # Force vacuum to ensure database is clean
-        purge_deleted_emails()
+                # Take one vacancy from the new process
+                process_id = None
+                if process_name:
+                    process_id, error = _take_vacancy(cursor, process_name)
+                    if process_id is None:
+                        cursor.execute("ROLLBACK")
+                        return False, error
+            else:
+                # No change in process assignment
+                # Get process ID for the current process
+                process_id = None
+                if process_name:
+                    process_id = _lookup_process_id(cursor, process_name)
+            
+            # Update employee with the new details
+            cursor.execute(
+                _SQL_UPDATE_EMPLOYEE,
+                (name, email, potential, communication, process_id, process_name, employee_id)
+            )
+            
+            # Verify the update worked
+            if cursor.rowcount == 0:
+                cursor.execute("ROLLBACK")
+                return False, "Employee not found or no changes made"
+            
+            # All operations successful, commit
+            cursor.execute("COMMIT")
+            _bump_data_version()
+            
+            return True, "Employee updated successfully"
         
-        return True, "Employee updated successfully"
-    
-    except Exception as e:
-        # Something went wrong, roll back
-        try:
-            cursor.execute("ROLLBACK")
-        except:
-            pass
+        except Exception as e:
+            # Something went wrong, roll back
+            try:
+                cursor.execute("ROLLBACK")
+            except:
+                pass
             
-        conn.close()
-        return False, f"Database error: {str(e)}"
+            return False, f"Database error: {str(e)}"
 
 def delete_employee(employee_id):
     """
@@ -477,90 +750,80 @@ def delete_employee(employee_id):
         bool: True if successful, False otherwise
         str: Message with result
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    try:
-        # Start transaction
-        cursor.execute("BEGIN TRANSACTION")
-        
-        # Get the employee's process information
-        cursor.execute("SELECT process_name, email FROM employees WHERE id = ?", (employee_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            cursor.execute("ROLLBACK")
-            conn.close()
-            return False, "Employee not found"
-        
-        process_name = result[0]
-        email = result[1]
-        
-        # Delete the employee
-        cursor.execute("DELETE FROM employees WHERE id = ?", (employee_id,))
-        
-        # Verify the delete worked
-        if cursor.rowcount == 0:
-            cursor.execute("ROLLBACK") 
-            conn.close()
-            return False, "Employee could not be deleted"
+    with _LOCK:
+        cursor = _CONN.cursor()
         
-        # Update process vacancy if employee was assigned
-        if process_name:
-            cursor.execute("""
-                UPDATE processes 
-                SET vacancy = vacancy + 1 
-                WHERE process_name = ?
-            """, (process_name,))
+        try:
+            # Start transaction
+            cursor.execute("BEGIN TRANSACTION")
             
-            # We don't check rowcount here since the process might have been deleted
-            # But we still want to delete the employee
-        
-        # All operations successful, commit the transaction
-        cursor.execute("COMMIT")
-        conn.close()
-        
-        # Force database cleaning to remove the deleted employee email
-        purge_deleted_emails()
-        
-        return True, f"Employee deleted and process '{process_name or 'None'}' vacancy updated"
+            # Get the employee's process information
+            cursor.execute("SELECT process_name, email FROM employees WHERE id = ?", (employee_id,))
+            result = cursor.fetchone()
+            
+            if not result:
+                cursor.execute("ROLLBACK")
+                return False, "Employee not found"
+            
+            process_name = result[0]
+            email = result[1]
+            
+            # Delete the employee
+            cursor.execute("DELETE FROM employees WHERE id = ?", (employee_id,))
+            
+            # Verify the delete worked
+            if cursor.rowcount == 0:
+                cursor.execute("ROLLBACK") 
+                return False, "Employee could not be deleted"
+            
+            # Update process vacancy if employee was assigned
+            if process_name:
+                cursor.execute(_SQL_RELEASE_VACANCY, (process_name,))
+                
+                # We don't check rowcount here since the process might have been deleted
+                # But we still want to delete the employee
+            
+            # All operations successful, commit the transaction
+            cursor.execute("COMMIT")
+            _bump_data_version()
+            
+            return True, f"Employee deleted and process '{process_name or 'None'}' vacancy updated"
         
-    except Exception as e:
-        # Something went wrong, roll back
-        try:
-            cursor.execute("ROLLBACK")
-        except:
-            pass
+        except Exception as e:
+            # Something went wrong, roll back
+            try:
+                cursor.execute("ROLLBACK")
+            except:
+                pass
             
-        conn.close()
-        return False, f"Database error: {str(e)}"
+            return False, f"Database error: {str(e)}"
 
 def purge_deleted_emails():
-    """Force cleanup of database to remove any lingering deleted emails"""
-    # This function will force SQLite to vacuum the database
-    # which should help with the issue of deleted emails still being detected
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("VACUUM")
-    conn.commit()
-    conn.close()
+    """
+    Compact the database file with VACUUM - for occasional maintenance only
+    
+    Deleted rows are gone as soon as their DELETE commits, so this is not
+    needed for correctness. VACUUM rewrites the whole file, so keep it off
+    the add/update/delete path.
+    """
+    with _LOCK:
+        _CONN.execute("VACUUM")
     
 def reset_database():
     """Hard reset of the database - for emergency use"""
-    import os
-    
-    # Close any open connections
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.close()
-    except:
-        pass
-    
-    # Delete the database file if it exists
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
-    
-    # Recreate the database
-    init_db()
+    with _LOCK:
+        # Close the shared connection before removing the file
+        _close_connection()
+        _PROCESS_ID_CACHE.clear()
+        
+        # Delete the database file (and any WAL sidecar files) if it exists
+        for path in (DB_PATH, DB_PATH + '-wal', DB_PATH + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        
+        # Recreate the database
+        init_db()
+        _bump_data_version()
 
 def get_process_suggestions(potential, communication):
     """
@@ -573,21 +836,45 @@ def get_process_suggestions(potential, communication):
     Returns:
         DataFrame: Process suggestions
     """
-    conn = sqlite3.connect(DB_PATH)
-    
-    # Query to get matching processes sorted by vacancy
-    query = """
-    SELECT process_name as Process_Name, potential as Potential, 
-           communication as Communication, vacancy as Vacancy
-    FROM processes
-    WHERE potential = ? AND communication = ? AND vacancy > 0
-    ORDER BY vacancy DESC
+    with _LOCK:
+        # Get matching processes sorted by vacancy
+        df = _read_frame(_SQL_PROCESS_SUGGESTIONS, (potential, communication))
+        
+        return df
+
+def db_find_matching_process(potential, communication):
     """
+    Find the best matching process directly in the database
     
-    df = pd.read_sql(query, conn, params=(potential, communication))
-    conn.close()
+    Prefers processes matching both potential and communication, then falls
+    back to potential only, picking the one with the highest vacancy.
     
-    return df
+    Args:
+        potential: Employee potential
+        communication: Employee communication level
+    
+    Returns:
+        dict: Matching process information or None if no match found
+    """
+    with _LOCK:
+        cursor = _CONN.cursor()
+        
+        cursor.execute(_SQL_BEST_MATCH, (potential, communication))
+        result = cursor.fetchone()
+        
+        # If no matches, try to find a match with only potential
+        if not result:
+            cursor.execute(_SQL_BEST_POTENTIAL_MATCH, (potential,))
+            result = cursor.fetchone()
+    
+    if result:
+        return {
+            'Process_Name': result[0],
+            'Potential': result[1],
+            'Communication': result[2],
+            'Vacancy': result[3]
+        }
+    return None
 
 # Initialize the database on module import
 init_db()
\ No newline at end of file
@@ -1,40 +1,61 @@
 import pandas as pd
 import numpy as np
 
+import database as db
+
+def _equals_mask(column, value):
+    """
+    Build a boolean array marking the rows of a column equal to value
+    
+    Categorical columns are compared on their integer codes.
+    
+    Args:
+        column: Series to compare
+        value: Value to look for
+    
+    Returns:
+        ndarray: Boolean mask
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = column.cat.categories
+        if value not in categories:
+            return np.zeros(len(column), dtype=bool)
+        return column.cat.codes.to_numpy() == categories.get_loc(value)
+    return column.to_numpy() == value
+
 def find_matching_process(process_data, potential, communication):
     """
     Find a matching process for an employee based on potential and communication skills
     
     Args:
-        process_data: DataFrame containing process information
+        process_data: DataFrame containing process information, or None to
+            query the processes table directly
         potential: Employee's potential (Sales, Consultation, Service, Support)
         communication: Employee's communication level (Excellent, Good, Very Good)
     
     Returns:
         dict: Matching process information or None if no match found
     """
+    # Let SQLite filter and pick the best row instead of loading every process
+    if process_data is None:
+        return db.db_find_matching_process(potential, communication)
+    
+    potential_match = _equals_mask(process_data['Potential'], potential)
+    vacancies = process_data['Vacancy'].to_numpy()
+    available = potential_match & (vacancies > 0)
+    
     # Filter processes by potential and communication
-    matching_processes = process_data[
-        (process_data['Potential'] == potential) & 
-        (process_data['Communication'] == communication) &
-        (process_data['Vacancy'] > 0)
-    ]
+    candidates = np.flatnonzero(available & _equals_mask(process_data['Communication'], communication))
     
     # If no matches, try to find a match with only potential
-    if matching_processes.empty:
-        matching_processes = process_data[
-            (process_data['Potential'] == potential) & 
-            (process_data['Vacancy'] > 0)
-        ]
-    
-    # Sort by vacancy (higher vacancy first)
-    matching_processes = matching_processes.sort_values('Vacancy', ascending=False)
+    if candidates.size == 0:
+        candidates = np.flatnonzero(available)
     
-    # Return the best match or None if no matches
-    if not matching_processes.empty:
-        return matching_processes.iloc[0].to_dict()
-    else:
+    # Return the match with the highest vacancy or None if no matches
+    if candidates.size == 0:
         return None
+    best = candidates[np.argmax(vacancies[candidates])]
+    return process_data.iloc[best].to_dict()
 
 def get_process_suggestions(process_data, potential, communication):
     """
@@ -48,17 +69,16 @@ def get_process_suggestions(process_data, potential, communication):
     Returns:
         DataFrame: Suggested processes
     """
+    potential_match = _equals_mask(process_data['Potential'], potential)
+    communication_match = _equals_mask(process_data['Communication'], communication)
+    
     # Get processes with either matching potential or communication
-    suggested_processes = process_data[
-        ((process_data['Potential'] == potential) | 
-         (process_data['Communication'] == communication)) &
-        (process_data['Vacancy'] > 0)
-    ]
+    keep = (potential_match | communication_match) & (process_data['Vacancy'].to_numpy() > 0)
     
     # Sort by relevance
     # - Matching potential is more important than matching communication
-    suggested_processes['relevance'] = 0
-    suggested_processes.loc[suggested_processes['Potential'] == potential, 'relevance'] += 2
-    suggested_processes.loc[suggested_processes['Communication'] == communication, 'relevance'] += 1
+    relevance = 2 * potential_match.astype(np.int8) + communication_match.astype(np.int8)
     
-    return suggested_processes.sort_values(['relevance', 'Vacancy'], ascending=[False, False])
+    return (process_data.assign(relevance=relevance)
+            .loc[keep]
+            .sort_values(['relevance', 'Vacancy'], ascending=[False, False]))
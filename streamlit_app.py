@@ -1,6 +1,6 @@
-import streamlit as st
+# Entry point for hosts that look for streamlit_app.py (such as the dev container).
+# The app and its page config live in app.py, which is run fresh on every rerun.
+import os
+import runpy
 
-st.set_page_config(page_title="Employee Matcher App", layout="wide")
-
-st.title("Employee Matcher App")
-st.write("Welcome to the app!")
+runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), run_name="__main__")
@@ -1,8 +1,36 @@
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 
+def _vacancy_bar(process_data, showscale):
+    """
+    Build the horizontal vacancy bar trace shared by the vacancy charts
+    
+    Args:
+        process_data: DataFrame containing process information
+        showscale: Whether to draw the vacancy color bar
+    
+    Returns:
+        Bar: Plotly bar trace
+    """
+    vacancies = process_data['Vacancy'].to_numpy()
+    names = process_data['Process_Name'].to_numpy()
+    
+    # Ascending order puts the largest vacancy at the top of the horizontal bars
+    order = np.argsort(vacancies, kind='stable')
+    
+    return go.Bar(
+        x=vacancies[order],
+        y=names[order],
+        orientation='h',
+        marker=dict(color=vacancies[order], colorscale='Viridis',
+                    showscale=showscale, colorbar=dict(title='Vacancy')),
+        name='Vacancy',
+        showlegend=False
+    )
+
 def create_vacancy_chart(process_data):
     """
     Create a horizontal bar chart showing vacancies for each process
@@ -13,22 +41,12 @@ def create_vacancy_chart(process_data):
     Returns:
         Figure: Plotly figure object
     """
-    # Sort by vacancy count (descending)
-    sorted_data = process_data.sort_values('Vacancy', ascending=True)
-    
     # Create horizontal bar chart
-    fig = px.bar(
-        sorted_data,
-        y='Process_Name',
-        x='Vacancy',
-        color='Vacancy',
-        orientation='h',
-        color_continuous_scale='Viridis',
-        title='Process Vacancies'
-    )
+    fig = go.Figure(_vacancy_bar(process_data, showscale=True))
     
     # Update layout
     fig.update_layout(
+        title='Process Vacancies',
         xaxis_title='Available Vacancies',
         yaxis_title='Process Name',
         height=min(400, 100 + len(process_data) * 30),  # Adjust height based on number of processes
@@ -37,6 +55,25 @@ def create_vacancy_chart(process_data):
     
     return fig
 
+def _potential_pie(process_data):
+    """
+    Build the pie trace of processes per potential shared by the distribution charts
+    
+    Args:
+        process_data: DataFrame containing process information
+    
+    Returns:
+        Pie: Plotly pie trace
+    """
+    # Count processes per potential type
+    potentials, counts = np.unique(process_data['Potential'].to_numpy(), return_counts=True)
+    
+    return go.Pie(
+        labels=potentials,
+        values=counts,
+        marker=dict(colors=px.colors.qualitative.Set3)
+    )
+
 def create_process_distribution(process_data):
     """
     Create a pie chart showing distribution of processes by potential
@@ -47,20 +84,12 @@ def create_process_distribution(process_data):
     Returns:
         Figure: Plotly figure object
     """
-    # Group by potential type and count
-    potential_counts = process_data.groupby('Potential').size().reset_index(name='count')
-    
     # Create pie chart
-    fig = px.pie(
-        potential_counts,
-        values='count',
-        names='Potential',
-        title='Processes by Potential Type',
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
+    fig = go.Figure(_potential_pie(process_data))
     
     # Update layout
     fig.update_layout(
+        title='Processes by Potential Type',
         margin=dict(l=10, r=10, t=40, b=10),
         legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
     )
@@ -103,3 +132,39 @@ def create_match_heatmap(process_data):
     )
     
     return fig
+
+def build_overview(process_data):
+    """
+    Create a single figure with process vacancies above the distribution by potential
+    
+    Uses the same traces as create_vacancy_chart and create_process_distribution,
+    so the overview is one figure to serialize instead of two.
+    
+    Args:
+        process_data: DataFrame containing process information
+    
+    Returns:
+        Figure: Plotly figure object
+    """
+    fig = make_subplots(
+        rows=2,
+        cols=1,
+        specs=[[{'type': 'xy'}], [{'type': 'domain'}]],
+        subplot_titles=('Process Vacancies', 'Processes by Potential Type'),
+        vertical_spacing=0.12
+    )
+    
+    fig.add_trace(_vacancy_bar(process_data, showscale=False), row=1, col=1)
+    
+    fig.add_trace(_potential_pie(process_data), row=2, col=1)
+    
+    # Update layout
+    fig.update_xaxes(title_text='Available Vacancies', row=1, col=1)
+    fig.update_yaxes(title_text='Process Name', row=1, col=1)
+    fig.update_layout(
+        height=min(400, 100 + len(process_data) * 30) + 350,  # Adjust height based on number of processes
+        margin=dict(l=10, r=10, t=40, b=10),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+    )
+    
+    return fig